@@ -1,17 +1,23 @@
 import abc
+import asyncio
+import atexit
 from collections import namedtuple
+import contextlib
 from datetime import datetime
 from enum import Enum
+import filecmp
+import functools
+import itertools
 import logging
-import numpy as np
+import multiprocessing
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
-import venv
+import threading
 
-from util import dir_changer, execute_wrapper
+from util import dir_changer, execute_wrapper, execute_wrapper_async
 
 
 class LibraryType(Enum):
@@ -25,6 +31,17 @@ class LibraryType(Enum):
     SKLEARN = 3
 
 
+# per-worker map from env name to `multiprocessing.Lock` guarding concurrent
+# creation of the same virtual environment (see `CaseRunner.run`)
+_env_locks = {}
+
+
+def _init_pool_worker(env_locks):
+    """initialize pool worker process with creation locks for every env"""
+    global _env_locks
+    _env_locks = env_locks
+
+
 VEnv = namedtuple('VEnv', [
     'env_dir',
     'python_path',
@@ -35,6 +52,15 @@ VEnv = namedtuple('VEnv', [
 ])
 
 
+# module level (not nested in CaseRunner) so pool workers can pickle it
+Outcome = namedtuple('Outcome', [
+    'env',
+    'case',
+    'is_success',
+    'reason',
+])
+
+
 class VirtualEnvBuilder:
     """
     VirtualEnvBuilder is responsible to create or reuse python virtual
@@ -42,68 +68,239 @@ class VirtualEnvBuilder:
     `activate` which returns `VEnv` structure.
     """
 
+    TEMPLATE_DIR_NAME = '.template'
+    # written into an env only after all installs succeed; its absence
+    # means the env is half-built and must be recreated
+    READY_MARKER = '.leaves_ready'
+
     def __init__(self, root_dir: str, reuse_envs: bool):
         self.root_dir = os.path.abspath(root_dir)
         self.reuse_envs = reuse_envs
         self.logger = logging.getLogger('VirtualEnvBuilder')
+        # prefer `uv` when it's on PATH: env creation and installs are
+        # many times faster than venv+pip, with the same end result
+        self.uv_path = shutil.which('uv')
+        # share one wheel cache between all envs (and all worker processes)
+        self.install_env = dict(
+            os.environ,
+            PIP_CACHE_DIR=os.path.join(self.root_dir, '.pipcache'),
+            UV_CACHE_DIR=os.path.join(self.root_dir, '.uvcache'),
+        )
+        # one scan of root_dir up front; `_if_exist` is then a set lookup
+        # instead of stat calls per `activate`. Only envs carrying the
+        # ready marker count: a dir left by a failed install is recreated
+        self._existing_envs = set()
+        if os.path.isdir(self.root_dir):
+            with os.scandir(self.root_dir) as entries:
+                self._existing_envs = {
+                    entry.name for entry in entries
+                    if entry.is_dir()
+                    and os.path.exists(os.path.join(entry.path, self.READY_MARKER))
+                }
+        # guards template bootstrap when `activate` is called from threads
+        # (pool workers use the `_env_locks` from the initializer instead)
+        self._template_lock = threading.Lock()
 
     def activate(self, library_type: LibraryType, version: str):
         self.logger.info(f'Activating environment: {library_type.name} {version}')
-        env_full_path = self._env_full_path(library_type, version)
-        env = VEnv(
-            env_dir=env_full_path,
-            python_path=os.path.join(env_full_path, 'bin', 'python'),
-            pip_path=os.path.join(env_full_path, 'bin', 'pip'),
-            env_name=self._env_name(library_type, version),
-            library=library_type,
-            version=version,
-        )
-        if self._if_exist(library_type, version) and self.reuse_envs:
+        env = self._make_venv(library_type, version)
+        with _env_locks.get(env.env_name) or contextlib.nullcontext():
+            if self._if_exist(env.env_name) and self.reuse_envs:
+                self.logger.info('Use already existed environment')
+                return env
+
+            self.logger.info('Create new environment..')
+            self._create_env(env.env_dir)
+
+            library_package = self._library_package(library_type, version)
+            self.logger.info(f'Installing sklearn {library_package}..')
+            execute_wrapper(self._install_command(env, 'sklearn', library_package),
+                            env=self.install_env)
+            self._mark_ready(env)
+
+        return env
+
+    async def activate_async(self, library_type: LibraryType, version: str):
+        """
+        Async variant of `activate` for provisioning many envs
+        concurrently. Env creation stays synchronous (it's quick); the
+        install, where the wall time goes, is awaited so other installs
+        can proceed meanwhile. Callers must not request the same
+        (library, version) twice concurrently.
+        """
+        self.logger.info(f'Activating environment: {library_type.name} {version}')
+        env = self._make_venv(library_type, version)
+        if self._if_exist(env.env_name) and self.reuse_envs:
             self.logger.info('Use already existed environment')
             return env
 
         self.logger.info('Create new environment..')
-        venv.create(
+        self._create_env(env.env_dir)
+
+        library_package = self._library_package(library_type, version)
+        self.logger.info(f'Installing sklearn {library_package}..')
+        await execute_wrapper_async(self._install_command(env, 'sklearn', library_package),
+                                    env=self.install_env)
+        self._mark_ready(env)
+
+        return env
+
+    def _make_venv(self, library_type, version):
+        env_name = self._env_name(library_type, version)
+        env_full_path = os.path.join(self.root_dir, env_name)
+        return VEnv(
             env_dir=env_full_path,
-            clear=True,
-            symlinks=True,
-            with_pip=True,
+            python_path=os.path.join(env_full_path, 'bin', 'python'),
+            pip_path=os.path.join(env_full_path, 'bin', 'pip'),
+            env_name=env_name,
+            library=library_type,
+            version=version,
         )
 
+    def _library_package(self, library_type, version):
         if library_type == LibraryType.LIGHTGBM:
-            self.logger.info(f'Installing sklearn..')
-            execute_wrapper([env.pip_path, 'install', 'sklearn'])
-            lightgbm_package = f'lightgbm=={version}'
-            self.logger.info(f'Installing {lightgbm_package}..')
-            execute_wrapper([env.pip_path, 'install', lightgbm_package])
+            return f'lightgbm=={version}'
+        return f'xgboost=={version}'
+
+    def _create_env(self, env_full_path):
+        if self.uv_path:
+            if os.path.exists(env_full_path):
+                shutil.rmtree(env_full_path)
+            execute_wrapper([self.uv_path, 'venv', env_full_path], env=self.install_env)
         else:
-            self.logger.info(f'Installing sklearn..')
-            execute_wrapper([env.pip_path, 'install', 'sklearn'])
-            xgboost_package = f'xgboost=={version}'
-            self.logger.info(f'Installing {xgboost_package}..')
-            execute_wrapper([env.pip_path, 'install', xgboost_package])
-
-        return env
+            self._copy_template(env_full_path)
+
+    def _install_command(self, env: VEnv, *packages):
+        if self.uv_path:
+            return [self.uv_path, 'pip', 'install',
+                    '--python', env.python_path, *packages]
+        # `python -m pip` (not `env.pip_path`) so the copied env installs
+        # into itself: pip's launcher script keeps the template's shebang.
+        # `--only-binary=:all:` deliberately disables the sdist fallback:
+        # sklearn/xgboost/lightgbm all publish wheels, and building from
+        # source inside a throwaway test env is never what we want
+        return [env.python_path, '-m', 'pip', 'install',
+                '--no-compile', '--no-build-isolation',
+                '--only-binary=:all:',
+                '--disable-pip-version-check', '--no-input',
+                *packages]
+
+    def _bootstrap_template(self):
+        """
+        Create the bare template venv once. `venv.create(with_pip=True)`
+        runs `ensurepip`, which is expensive, so we pay that cost a single
+        time and copy the result for every concrete env.
+        """
+        template_dir = os.path.join(self.root_dir, self.TEMPLATE_DIR_NAME)
+        with _env_locks.get(self.TEMPLATE_DIR_NAME) or self._template_lock:
+            if not os.path.isdir(template_dir):
+                import venv  # lazy: only needed on the pip fallback path
+                self.logger.info('Bootstrapping template environment..')
+                venv.create(
+                    env_dir=template_dir,
+                    clear=True,
+                    symlinks=True,
+                    with_pip=True,
+                )
+        return template_dir
+
+    def _copy_template(self, env_full_path):
+        """copy the template venv into place (reflink-aware when `cp` supports it)"""
+        template_dir = self._bootstrap_template()
+        if os.path.exists(env_full_path):
+            shutil.rmtree(env_full_path)
+        if sys.platform.startswith('linux'):
+            # `--reflink=auto` makes this nearly free on COW filesystems
+            execute_wrapper(['cp', '--reflink=auto', '-a', template_dir, env_full_path])
+        else:
+            shutil.copytree(template_dir, env_full_path, symlinks=True)
 
     def _env_name(self, library_type, version):
         return f'{library_type.name.lower()}_{version}'
 
-    def _env_full_path(self, library_type, version):
-        return os.path.join(self.root_dir, self._env_name(library_type, version))
+    def _if_exist(self, env_name):
+        return env_name in self._existing_envs
 
-    def _if_exist(self, library_type, version):
-        env_full_path = self._env_full_path(library_type, version)
-        if os.path.exists(env_full_path):
-            if not os.path.isdir(env_full_path):
-                raise RuntimeError(f"'{env_full_path}' should be directory")
-            return True
-        return False
+    def _mark_ready(self, env: VEnv):
+        with open(os.path.join(env.env_dir, self.READY_MARKER), 'w', encoding='utf-8'):
+            pass
+        self._existing_envs.add(env.env_name)
 
 
 class CompareError(RuntimeError):
     pass
 
 
+def _read_matrix_chunks(fileobj, chunk_rows=4096):
+    """
+    Yield float64 blocks of at most `chunk_rows` rows parsed from a TSV
+    stream. `np.loadtxt` is used instead of `np.genfromtxt` because it's
+    considerably faster on purely numeric input.
+    """
+    import numpy as np  # lazy: keeps worker/CLI startup free of numpy
+    while True:
+        lines = list(itertools.islice(fileobj, chunk_rows))
+        if not lines:
+            return
+        yield np.loadtxt(lines, delimiter='\t', dtype=np.float64, ndmin=2)
+
+
+def _count_mismatches(m1, m2, tolerance, block_rows=4096):
+    """
+    Count elements of `m1` and `m2` differing by more than `tolerance`.
+    Works block-by-block with one reusable scratch buffer instead of
+    materializing full-size |m1 - m2| temporaries; the inputs are not
+    modified in place.
+    """
+    import numpy as np  # lazy: keeps worker/CLI startup free of numpy
+    m1 = np.atleast_2d(m1)
+    m2 = np.atleast_2d(m2)
+    scratch = np.empty_like(m1[:block_rows])
+    mismatches = 0
+    for start in range(0, m1.shape[0], block_rows):
+        a = m1[start:start + block_rows]
+        b = m2[start:start + block_rows]
+        diff = scratch[:a.shape[0]]
+        np.subtract(a, b, out=diff)
+        np.abs(diff, out=diff)
+        mismatches += int(np.count_nonzero(diff > tolerance))
+    return mismatches
+
+
+def _go_cache_env(root_dir):
+    """
+    Environment for `go` invocations with build and module caches shared
+    across all cases, so the `leaves` module graph and common deps are
+    compiled once instead of per case directory.
+    """
+    return dict(
+        os.environ,
+        GOCACHE=os.path.join(root_dir, '.gocache'),
+        GOMODCACHE=os.path.join(root_dir, '.gomodcache'),
+    )
+
+
+def _run_one(task):
+    """
+    Run one (case, version) pair inside a pool worker and return its
+    `Outcome`. Top-level function so it's picklable; the logger is passed
+    by name and re-acquired here because logger objects don't pickle.
+    """
+    case_class, version, dirname, root_dir, reuse_envs, leaves_path, logger_name = task
+    logger = logging.getLogger(logger_name)
+    env_builder = VirtualEnvBuilder(root_dir, reuse_envs)
+    env = env_builder.activate(case_class.library, version)
+    case = case_class(env, logger, dirname, leaves_path,
+                      go_env=_go_cache_env(root_dir))
+    is_success, reason = case.run(env)
+    return Outcome(
+        env=env,
+        case=case_class.__name__,
+        is_success=is_success,
+        reason=reason,
+    )
+
+
 class CaseRunner:
     """
     CaseRunner is responsible for running particular test cases with
@@ -111,28 +308,73 @@ class CaseRunner:
     generated by `report` method.
     """
 
-    Outcome = namedtuple('Outcome', [
-        'env',
-        'case',
-        'is_success',
-        'reason',
-    ])
+    Outcome = Outcome
 
     def __init__(self, env_builder: VirtualEnvBuilder, logger, leaves_path=None):
         self.env_builder = env_builder
         self.logger = logger
         self.leaves_path = leaves_path
+        self.go_env = _go_cache_env(env_builder.root_dir)
         self.outcomes = []
 
-    def run(self, case_class: type, dirname=None):
-        """run test case on all environment versions"""
-        for version in case_class.versions:
-            self.run_single(case_class, version, dirname)
+    def prewarm(self, case_classes, max_concurrency=8):
+        """
+        Provision the envs for every unique (library, version) among
+        `case_classes` concurrently via async subprocesses; total
+        startup drops from the sum of install times to roughly the
+        slowest one. The semaphore keeps disk/network from thrashing.
+        """
+        pairs = {(case_class.library, version)
+                 for case_class in case_classes
+                 for version in case_class.versions}
+        if not pairs:
+            return
+        self.logger.info(f'Prewarming {len(pairs)} environments..')
+        asyncio.run(self._prewarm(pairs, max_concurrency))
+        # every env was (re)provisioned and marked ready just now, so the
+        # case runs can trust them even without --reuse-envs; otherwise
+        # they would recreate each env and the prewarm would be pure waste
+        self.env_builder.reuse_envs = True
+
+    async def _prewarm(self, pairs, max_concurrency):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def activate_one(pair):
+            async with semaphore:
+                await self.env_builder.activate_async(*pair)
+
+        await asyncio.gather(*(activate_one(pair) for pair in pairs))
+
+    def run(self, case_class: type, dirname=None, processes=None):
+        """run test case on all environment versions in parallel"""
+        tasks = [
+            (case_class, version,
+             # versions run concurrently and must not share output files,
+             # so each gets its own subdirectory of `dirname`
+             os.path.join(dirname, version) if dirname else None,
+             self.env_builder.root_dir, self.env_builder.reuse_envs,
+             self.leaves_path, self.logger.name)
+            for version in case_class.versions
+        ]
+        env_locks = {
+            self.env_builder._env_name(case_class.library, version): multiprocessing.Lock()
+            for version in case_class.versions
+        }
+        env_locks[VirtualEnvBuilder.TEMPLATE_DIR_NAME] = multiprocessing.Lock()
+        if processes is None:
+            processes = min(len(tasks), os.cpu_count() or 1)
+        with multiprocessing.Pool(
+            processes=processes,
+            initializer=_init_pool_worker,
+            initargs=(env_locks,),
+        ) as pool:
+            self.outcomes.extend(pool.imap_unordered(_run_one, tasks))
 
     def run_single(self, case_class: type, version: str, dirname=None):
         """run test case on the particular environment version from `version` parameter"""
         env = self.env_builder.activate(case_class.library, version)
-        case = case_class(env, self.logger, dirname, self.leaves_path)
+        case = case_class(env, self.logger, dirname, self.leaves_path,
+                          go_env=self.go_env)
         is_success, reason = case.run(env)
         outcome = self.Outcome(
             env=env,
@@ -143,6 +385,12 @@ class CaseRunner:
         self.outcomes.append(outcome)
 
 
+@functools.lru_cache(maxsize=None)
+def _parse_version(version):
+    """'1.2.3' -> (1, 2, 3); cached because sorts see each version many times"""
+    return tuple(map(int, version.split('.')))
+
+
 class ReportFormatter:
     def __init__(self, outcomes: list):
         self.outcomes = outcomes
@@ -181,90 +429,197 @@ Generated {}
         nrows = len(list_of_rows)
         if nrows == 0:
             return '\n'
-        ncols = len(list_of_rows[0])
 
-        fields_len = [0] * ncols
-        for row in list_of_rows:
-            for j in range(ncols):
-                if fields_len[j] < len(row[j]):
-                    fields_len[j] = len(row[j])
+        fields_len = [max(map(len, column)) for column in zip(*list_of_rows)]
+
+        def center(cell, width):
+            # like str.center, but biased to the right like '{: ^w}' so
+            # the generated tables stay byte-identical
+            left = (width - len(cell)) // 2
+            return (' '*left + cell).ljust(width)
 
-        format_string = '|'
-        for width in fields_len:
-            format_string += '{{: ^{}}}|'.format(width)
-        format_string += '\n'
+        def format_row(row):
+            # plain padding is a couple of C calls per cell, vs
+            # re-parsing a format string for every row
+            return '|' + '|'.join(
+                center(cell, width) for cell, width in zip(row, fields_len)) + '|\n'
 
         outline_list = ['-'*width for width in fields_len]
 
-        ret = ''
-        ret += format_string.format(*list_of_rows[0])
-        ret += format_string.format(*outline_list)
-        for row in list_of_rows[1:]:
-            ret += format_string.format(*row)
+        parts = [
+            format_row(list_of_rows[0]),
+            format_row(outline_list),
+        ]
+        parts.extend(format_row(row) for row in list_of_rows[1:])
 
-        return ret
+        return ''.join(parts)
 
 
     def report(self) -> str:
         """generate whole report about test cases outcomes"""
-        ret = self.head_text()
-
-        libraries = list(set(outcome.env.library for outcome in self.outcomes))
-
-        for library in libraries:
-            ret += f'\n## {library.name}\n\n'
-            cases = list(sorted(set(outcome.case
-                for outcome in self.outcomes
-                if outcome.env.library == library
-            )))
-            versions = list(sorted(set(outcome.env.version
-                for outcome in self.outcomes
-                if outcome.env.library == library
-            ),
-            key=lambda s: tuple(map(int, s.split('.')))
-            ))
+        parts = [self.head_text()]
+
+        # single pass over outcomes: library -> case -> version -> is_success
+        by_library = {}
+        for outcome in self.outcomes:
+            by_case = by_library.setdefault(outcome.env.library, {})
+            by_case.setdefault(outcome.case, {})[outcome.env.version] = outcome.is_success
+
+        for library, by_case in by_library.items():
+            parts.append(f'\n## {library.name}\n\n')
+            versions = sorted(
+                {version for version_map in by_case.values() for version in version_map},
+                key=_parse_version,
+            )
             header = ['Case'] + versions
             list_of_rows = [header]
-            for case in cases:
-                version_map = {outcome.env.version: outcome.is_success
-                    for outcome in self.outcomes
-                    if outcome.env.library == library and outcome.case == case
-                }
+            for case in sorted(by_case):
+                version_map = by_case[case]
                 row = ['-'] * len(versions)
                 for i, version in enumerate(versions):
                     is_success = version_map.get(version)
                     if is_success is not None:
                         row[i] = 'V' if is_success else 'X'
                 list_of_rows.append([case] + row)
-            ret += self._markdown_table(list_of_rows)
+            parts.append(self._markdown_table(list_of_rows))
+
+        parts.append(self.tail_text())
+        return ''.join(parts)
+
+
+class VenvWorker:
+    """
+    Long-lived interactive interpreter bound to one venv's python.
+    Spawning a fresh interpreter per case pays startup cost (tens to
+    hundreds of ms) every time; one `python -i` process per venv
+    amortizes it over all cases sharing that venv. Scripts are executed
+    via `runpy` and completion is detected by a marker line.
+    """
 
-        return ret + self.tail_text()
+    _DONE_MARKER = '__LEAVES_SCRIPT_DONE__'
+
+    def __init__(self, python_path):
+        self.python_path = python_path
+        self.process = subprocess.Popen(
+            [python_path, '-u', '-i'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding='utf-8',
+        )
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def run(self, script_filename, cwd):
+        """execute `script_filename` with `cwd` as working directory"""
+        # single physical line so the interactive interpreter runs it as
+        # one statement; errors are caught so the worker survives them
+        source = (
+            'try:\n'
+            '    import os, runpy\n'
+            f'    os.chdir({cwd!r})\n'
+            f"    runpy.run_path({script_filename!r}, run_name='__main__')\n"
+            'except BaseException:\n'
+            '    import traceback\n'
+            '    traceback.print_exc()\n'
+            f'    print({self._DONE_MARKER + " FAIL"!r}, flush=True)\n'
+            'else:\n'
+            f'    print({self._DONE_MARKER + " OK"!r}, flush=True)\n'
+        )
+        self.process.stdin.write(f'exec({source!r})\n')
+        self.process.stdin.flush()
+
+        output_lines = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(
+                    f"worker '{self.python_path}' exited unexpectedly: "
+                    f"{''.join(output_lines)}")
+            if self._DONE_MARKER in line:
+                if line.rstrip().endswith('OK'):
+                    return
+                raise RuntimeError(
+                    f"'{script_filename}' failed: {''.join(output_lines)}")
+            output_lines.append(line)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+
+# canonical go.mod file per leaves_path, written once (per process)
+_go_mod_cache = {}
+
+
+def _canonical_go_mod(leaves_path):
+    """
+    Write the go.mod content for `leaves_path` to one canonical file and
+    return its path. Case dirs link to it instead of rewriting identical
+    content, which also keeps module identity stable so Go's build cache
+    hits across cases.
+    """
+    path = _go_mod_cache.get(leaves_path)
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='leaves_go_mod')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fout:
+            fout.write(f"""
+module main
+
+require "github.com/zhongdai/leaves" v0.0.0
+replace "github.com/zhongdai/leaves" v0.0.0 => "{leaves_path}"
+""")
+        _go_mod_cache[leaves_path] = path
+    return path
+
+
+# one worker per venv python, created on first use (per process)
+_venv_workers = {}
+
+
+def _venv_worker(venv: VEnv):
+    worker = _venv_workers.get(venv.python_path)
+    if worker is None or not worker.is_alive():
+        worker = VenvWorker(venv.python_path)
+        _venv_workers[venv.python_path] = worker
+    return worker
+
+
+@atexit.register
+def _shutdown_venv_workers():
+    for worker in _venv_workers.values():
+        worker.close()
 
 
 class Case(abc.ABC):
-    def __init__(self, venv: VEnv, logger, dirname=None, leaves_path=None):
+    def __init__(self, venv: VEnv, logger, dirname=None, leaves_path=None, go_env=None):
         self.venv = venv
-        self.dirname = dirname
+        self.dirname = os.path.abspath(dirname) if dirname else None
         self.leaves_path = leaves_path
+        self.go_env = go_env
         self.logger = logger
 
-    def prepare_dir(self):
+    def prepare_dir(self, stack: contextlib.ExitStack):
         if not self.dirname:
-            self.delete_dir = True
-            self.dirname = tempfile.mkdtemp(prefix='matrixtest')
+            delete_dir = True
+            self.dirname = stack.enter_context(
+                tempfile.TemporaryDirectory(prefix='matrixtest'))
         else:
-            self.delete_dir = False
-            self.dirname = os.path.abspath(self.dirname)
+            delete_dir = False
             os.makedirs(self.dirname, exist_ok=True)
-        self.logger.info(f'Dir: {self.dirname} (delete: {self.delete_dir})')
+        self.logger.info(f'Dir: {self.dirname} (delete: {delete_dir})')
 
     def run_python(self):
-        with dir_changer(self.dirname, delete_dir=False):
-            script_filename = f'{self.__class__.__name__.lower()}.py'
-            with open(script_filename, 'w', encoding='utf-8') as fout:
-                fout.write(self.python_code())
+        script_filename = os.path.join(
+            self.dirname, f'{self.__class__.__name__.lower()}.py')
+        with open(script_filename, 'w', encoding='utf-8') as fout:
+            fout.write(self.python_code())
 
-            execute_wrapper([self.venv.python_path, script_filename])
+        _venv_worker(self.venv).run(script_filename, cwd=self.dirname)
 
     def run_go(self):
         with dir_changer(self.dirname, delete_dir=False):
@@ -273,16 +628,17 @@ class Case(abc.ABC):
                 fout.write(self.go_code())
 
             if self.leaves_path:
-                with open('go.mod', 'w', encoding='utf-8') as fout:
-                    fout.write(f"""
-module main
-
-require "github.com/zhongdai/leaves" v0.0.0
-replace "github.com/zhongdai/leaves" v0.0.0 => "{self.leaves_path}"
-""")
+                go_mod_source = _canonical_go_mod(self.leaves_path)
+                if os.path.exists('go.mod'):
+                    os.remove('go.mod')
+                try:
+                    os.link(go_mod_source, 'go.mod')
+                except OSError:
+                    # hardlinks may be unavailable (Windows, cross-device)
+                    shutil.copyfile(go_mod_source, 'go.mod')
 
             self.logger.info(f'Build {script_filename}')
-            execute_wrapper(['go', 'build', script_filename])
+            execute_wrapper(['go', 'build', script_filename], env=self.go_env)
 
             executable_filename = script_filename[:-3]
             if not os.path.isfile(executable_filename):
@@ -301,27 +657,41 @@ replace "github.com/zhongdai/leaves" v0.0.0 => "{self.leaves_path}"
         self.logger.info(f"Compare matrices from files: '{matrix1_filename}' and '{matrix2_filename}'")
         matrix1_filename_full = os.path.join(self.dirname, matrix1_filename)
         matrix2_filename_full = os.path.join(self.dirname, matrix2_filename)
-        m1 = np.genfromtxt(matrix1_filename_full, delimiter='\t')
-        m2 = np.genfromtxt(matrix2_filename_full, delimiter='\t')
-        if m1.shape != m2.shape:
-            raise CompareError(f'm1.shape != m2.shape ({m1.shape} != {m2.shape})')
-        number_of_mismatches = np.sum(np.abs(m1 - m2) > tolerance)
-        if number_of_mismatches > max_number_of_mismatches_ratio * m1.size:
-            raise CompareError(f'number of mismatches = {number_of_mismatches} (maximum allowed {max_number_of_mismatches_ratio * m1.size}')
+        # byte-identical files (the common passing case) need no parsing;
+        # filecmp compares sizes first and then reads in 8KB buffers
+        if filecmp.cmp(matrix1_filename_full, matrix2_filename_full, shallow=False):
+            self.logger.info('Files are byte-identical, skip parsing')
+            return
+        number_of_mismatches = 0
+        number_of_elements = 0
+        with open(matrix1_filename_full, encoding='utf-8') as fin1, \
+                open(matrix2_filename_full, encoding='utf-8') as fin2:
+            chunks = itertools.zip_longest(
+                _read_matrix_chunks(fin1),
+                _read_matrix_chunks(fin2),
+            )
+            for m1, m2 in chunks:
+                if m1 is None or m2 is None or m1.shape != m2.shape:
+                    raise CompareError(
+                        f"matrix shapes differ ('{matrix1_filename}' vs '{matrix2_filename}')")
+                number_of_mismatches += _count_mismatches(m1, m2, tolerance)
+                number_of_elements += m1.size
+        if number_of_mismatches > max_number_of_mismatches_ratio * number_of_elements:
+            raise CompareError(f'number of mismatches = {number_of_mismatches} (maximum allowed {max_number_of_mismatches_ratio * number_of_elements}')
 
     def run(self, venv: VEnv):
         self.logger.info(f'Run case: {self.__class__.__name__} on {venv.env_name}')
         try:
-            self.prepare_dir()
-            self.run_python()
-            self.run_go()
-            self.compare()
+            # the stack owns the temp dir (if any), so it's cleaned up on
+            # every exit path
+            with contextlib.ExitStack() as stack:
+                self.prepare_dir(stack)
+                self.run_python()
+                self.run_go()
+                self.compare()
         except Exception as e:
             self.logger.exception('')
             return False, str(e)
-        finally:
-            if self.delete_dir:
-                shutil.rmtree(self.dirname)
         return True, ''
 
     @abc.abstractmethod
@@ -54,7 +54,9 @@ if __name__ == '__main__':
     env_builder = VirtualEnvBuilder(params.root_dir, params.reuse_envs)
     case_runner = CaseRunner(env_builder, logger, params.leaves_path)
     if not params.case:
-        # run all cases
+        # run all cases; provision the envs up front so the case runs
+        # never wait on pip
+        case_runner.prewarm(cases)
         for case in cases:
             case_runner.run(case)
     else:
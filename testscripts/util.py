@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import contextmanager
 import os
 import shutil
@@ -20,9 +21,23 @@ def dir_changer(dirname, delete_dir):
                 shutil.rmtree(dirname)
 
 
-def execute_wrapper(args):
+def execute_wrapper(args, env=None):
     """Execute external program and check exit code. Return stdout"""
-    ret = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8')
+    ret = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8', env=env)
     if ret.returncode != 0:
         raise RuntimeError(f"'{' '.join(ret.args)}' failed: {ret.stderr}")
     return ret.stdout
+
+
+async def execute_wrapper_async(args, env=None):
+    """Async variant of `execute_wrapper` for running programs concurrently"""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"'{' '.join(args)}' failed: {stderr.decode('utf-8')}")
+    return stdout.decode('utf-8')